@@ -0,0 +1,422 @@
+import base64
+import hashlib
+import io
+import re
+import numpy as np
+import pandas as pd
+from dash import html, dash_table, Patch
+from flask_caching import Cache
+import plotly.graph_objects as go
+
+# Cores e estilos
+COLORS = {
+    'background': '#f8f9fa',
+    'card': '#ffffff',
+    'primary': '#2C3E50',
+    'secondary': '#3498DB',
+    'text': '#2c3e50',
+    'border': '#e9ecef'
+}
+
+# Estilos comuns
+CARD_STYLE = {
+    'backgroundColor': COLORS['card'],
+    'borderRadius': '8px',
+    'boxShadow': '0 2px 4px rgba(0,0,0,0.1)',
+    'padding': '20px',
+    'margin': '10px',
+    'border': f'1px solid {COLORS["border"]}'
+}
+
+# Estilo comum para os gráficos, aplicado na criação de cada figura
+GRAPH_STYLE = {
+    'paper_bgcolor': COLORS['card'],
+    'plot_bgcolor': COLORS['card'],
+    'font': {'family': '"Segoe UI", "Roboto", sans-serif', 'color': COLORS['text']},
+    'title': {'font': {'size': 20, 'color': COLORS['primary']}},
+    'margin': dict(t=30, l=10, r=10, b=10)
+}
+
+def _graph_layout(titulo, eixo_x=None, eixo_y=None):
+    """Layout de um gráfico: GRAPH_STYLE com o título e os nomes dos eixos"""
+    layout = {**GRAPH_STYLE, 'title': {**GRAPH_STYLE['title'], 'text': titulo}}
+    if eixo_x:
+        layout['xaxis'] = {'title': {'text': eixo_x}}
+    if eixo_y:
+        layout['yaxis'] = {'title': {'text': eixo_y}}
+    return layout
+
+# Colunas com poucos valores distintos, lidas direto como categoria;
+# TAGS sempre como texto (vazia, o pandas a leria como float64)
+CSV_DTYPES = {
+    'STATUS': 'category',
+    'DEPARTAMENTO': 'category',
+    'ATENDENTE': 'category',
+    'TAGS': 'string'
+}
+
+# Colunas de data e o formato exportado pelo sistema de atendimento
+DATE_COLUMNS = ['DATA', 'DATAFINALIZACAO', 'DATAULTIMAMENSAGEM']
+DATE_FORMAT = '%d/%m/%Y %H:%M'
+
+# Arquivos acima deste tamanho são lidos em blocos de CHUNK_SIZE linhas
+CHUNK_THRESHOLD = 64 * 1024 * 1024
+CHUNK_SIZE = 200_000
+
+def _ler_csv(decoded):
+    """
+    Lê o CSV direto dos bytes
+    Returns:
+        Iterável de DataFrames: o arquivo inteiro, lido pelo Arrow quando
+        possível, ou blocos de CHUNK_SIZE linhas para arquivos grandes
+    """
+    if len(decoded) <= CHUNK_THRESHOLD:
+        try:
+            df = pd.read_csv(
+                io.BytesIO(decoded),
+                engine='pyarrow',
+                dtype=CSV_DTYPES,
+                parse_dates=DATE_COLUMNS,
+                date_format=DATE_FORMAT
+            )
+            # Datas fora do formato esperado ficam como texto: usar o leitor C
+            if all(pd.api.types.is_datetime64_any_dtype(df[col]) for col in DATE_COLUMNS):
+                return [df]
+        except (ImportError, ValueError):
+            pass
+    return pd.read_csv(
+        io.BytesIO(decoded),
+        dtype=CSV_DTYPES,
+        parse_dates=DATE_COLUMNS,
+        dayfirst=True,
+        chunksize=CHUNK_SIZE
+    )
+
+def _followup_parcial(chunk):
+    """Última interação e início de cada atendimento dentro de um bloco"""
+    # As datas já chegam convertidas por _ler_csv (parse_dates)
+    return chunk.groupby(['NUMERO', 'NOME', 'STATUS'], observed=True).agg(
+        DATAULTIMAMENSAGEM=('DATAULTIMAMENSAGEM', 'max'),
+        DATA=('DATA', 'min')  # Data de criação do atendimento
+    )
+
+def _contar_categorias(coluna):
+    """value_counts de uma coluna categórica via np.bincount sobre os códigos"""
+    codes = coluna.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(coluna.cat.categories))
+    return pd.Series(counts, index=coluna.cat.categories.to_numpy())
+
+def _agregar_chunks(chunks):
+    """
+    Percorre o CSV bloco a bloco acumulando apenas as contagens usadas no
+    dashboard, sem manter o DataFrame completo em memória
+    Returns:
+        Dicionário com as contagens agregadas e a tabela de follow-up
+    """
+    status_counts = pd.Series(dtype='int64')
+    dept_counts = pd.Series(dtype='int64')
+    timeline_counts = pd.Series(dtype='int64')
+    tags_counts = pd.Series(dtype='int64')
+    atendentes_counts = pd.Series(dtype='int64')
+    total = 0
+    data_mais_recente = pd.NaT
+    followup_parts = []
+
+    for chunk in chunks:
+        status_counts = status_counts.add(_contar_categorias(chunk['STATUS']), fill_value=0)
+        dept_counts = dept_counts.add(_contar_categorias(chunk['DEPARTAMENTO']), fill_value=0)
+        timeline_counts = timeline_counts.add(chunk['DATA'].dt.floor('D').value_counts(sort=False), fill_value=0)
+        tags_counts = tags_counts.add(
+            chunk['TAGS'].dropna().str.split(',', expand=False).explode().str.strip().value_counts(),
+            fill_value=0
+        )
+        atendentes_counts = atendentes_counts.add(_contar_categorias(chunk['ATENDENTE']), fill_value=0)
+        total += len(chunk)
+
+        # Data mais recente sobre todas as linhas (o follow-up descarta chaves vazias)
+        ultima_mensagem = chunk['DATAULTIMAMENSAGEM'].max()
+        if pd.notna(ultima_mensagem):
+            data_mais_recente = ultima_mensagem if pd.isna(data_mais_recente) else max(data_mais_recente, ultima_mensagem)
+
+        followup_parts.append(_followup_parcial(chunk))
+
+    # Juntar os follow-ups parciais: o mesmo cliente pode aparecer em vários blocos
+    followup_df = pd.concat(followup_parts).groupby(level=['NUMERO', 'NOME', 'STATUS']).agg(
+        DATAULTIMAMENSAGEM=('DATAULTIMAMENSAGEM', 'max'),
+        DATA=('DATA', 'min')
+    ).reset_index()
+
+    # Tags e colaboradores: só o top 10 é exibido, sem ordenar todas as contagens
+    return {
+        'status': status_counts.astype('int64').sort_values(ascending=False),
+        'departamento': dept_counts.astype('int64').sort_values(ascending=False),
+        'timeline': timeline_counts.astype('int64').sort_index(),
+        'tags': tags_counts.astype('int64').nlargest(10),
+        'atendentes': atendentes_counts.astype('int64').nlargest(10),
+        'total': total,
+        'data_mais_recente': data_mais_recente,
+        'followup': followup_df
+    }
+
+# Cache dos uploads já processados (o hash do conteúdo é a chave)
+cache = Cache()
+CACHE_TIMEOUT = 3600
+
+# Linhas por página da tabela de follow-up (paginada no servidor)
+FOLLOWUP_PAGE_SIZE = 10
+
+@cache.memoize(timeout=CACHE_TIMEOUT, args_to_ignore=['content_string'])
+def _parse_from_bytes(hash_key, content_string):
+    """Decodifica e agrega o CSV; o resultado fica em cache por hash_key"""
+    return _agregar_chunks(_ler_csv(base64.b64decode(content_string, validate=False)))
+
+# Atualizar parse_contents para corrigir warning de datas
+def parse_contents(contents):
+    """
+    Função para processar o arquivo carregado
+    Returns:
+        Tupla (dados agregados, hash do conteúdo, mensagem de erro)
+    """
+    try:
+        _content_type, _, content_string = contents.partition(',')
+        hash_key = hashlib.blake2b(content_string.encode(), digest_size=16).hexdigest()
+        resumo = _parse_from_bytes(hash_key, content_string)
+        return resumo, hash_key, None
+    except Exception as e:
+        return None, None, f'Erro ao processar arquivo: {str(e)}'
+
+@cache.memoize(timeout=CACHE_TIMEOUT, args_to_ignore=['resumo'])
+def atualizar_graficos(df_hash, resumo):
+    """
+    Função para atualizar os gráficos com base nos dados agregados
+    Args:
+        df_hash: Hash do arquivo carregado, usado como chave do cache
+        resumo: Contagens retornadas por parse_contents
+    Returns:
+        Tupla com os gráficos atualizados
+    """
+    # Gráfico de Status
+    status_df = resumo['status'].rename_axis('Status').reset_index(name='Quantidade')
+    fig_status = go.Figure(
+        go.Bar(x=status_df['Status'].to_numpy(), y=status_df['Quantidade'].to_numpy()),
+        layout=_graph_layout('Distribuição de Status', 'Status', 'Quantidade')
+    )
+
+    # Gráfico de Departamentos
+    dept_df = resumo['departamento'].rename_axis('Departamento').reset_index(name='Quantidade')
+    fig_dept = go.Figure(
+        go.Pie(labels=dept_df['Departamento'].to_numpy(), values=dept_df['Quantidade'].to_numpy()),
+        layout=_graph_layout('Distribuição por Departamento')
+    )
+
+    # Gráfico Timeline
+    timeline_df = resumo['timeline'].rename_axis('Data').reset_index(name='Quantidade')
+    fig_timeline = go.Figure(
+        go.Scatter(x=timeline_df['Data'].to_numpy(), y=timeline_df['Quantidade'].to_numpy(), mode='lines'),
+        layout=_graph_layout('Volume de Atendimentos por Dia', 'Data', 'Quantidade')
+    )
+
+    # Gráfico Tags
+    tags_df = resumo['tags'].rename_axis('Tag').reset_index(name='Quantidade')
+    fig_tags = go.Figure(
+        go.Bar(x=tags_df['Tag'].to_numpy(), y=tags_df['Quantidade'].to_numpy()),
+        layout=_graph_layout('Tags', 'Tags', 'Número de Ocorrências')
+    )
+
+    # Gráfico de Colaboradores
+    colaboradores_df = resumo['atendentes'].rename_axis('Colaborador').reset_index(name='Quantidade')
+    fig_atendentes = go.Figure(
+        go.Bar(x=colaboradores_df['Colaborador'].to_numpy(), y=colaboradores_df['Quantidade'].to_numpy()),
+        layout=_graph_layout('Distribuição dos Colaboradores', 'Colaborador', 'Quantidade')
+    )
+
+    # KPIs
+    kpi_fig = go.Figure(
+        go.Indicator(
+            mode="number",
+            value=resumo['total'],
+            title="Total de Atendimentos",
+            domain={'row': 0, 'column': 0}
+        ),
+        layout=GRAPH_STYLE
+    )
+
+    return fig_status, fig_dept, fig_timeline, fig_tags, fig_atendentes, kpi_fig
+
+def criar_patches(figuras):
+    """
+    Converte as figuras em Patches com apenas os dados do traço, para
+    atualizar gráficos que já estão na tela sem reenviar o layout
+    """
+    patches = []
+    for fig in figuras:
+        patch = Patch()
+        trace = fig.data[0].to_plotly_json()
+        for key in ('x', 'y', 'labels', 'values', 'value'):
+            if key in trace:
+                patch['data'][0][key] = trace[key]
+        patches.append(patch)
+    return patches
+
+@cache.memoize(timeout=CACHE_TIMEOUT, args_to_ignore=['resumo'])
+def preparar_followup(df_hash, resumo=None):
+    """
+    Monta os dados da tabela de follow-up, em cache por df_hash para que a
+    paginação no servidor não precise do arquivo
+    Returns:
+        Tupla (DataFrame da tabela, data mais recente), ou None se o upload
+        não está mais no cache e resumo não foi informado
+    """
+    if resumo is None:
+        return None
+
+    # Última interação por número, já agregada por parse_contents
+    followup_df = resumo['followup'].copy()
+    
+    # Encontrar data mais recente no dataset
+    data_mais_recente = resumo['data_mais_recente']
+    
+    # Calcular dias sem contato
+    followup_df['DIAS_SEM_CONTATO'] = (data_mais_recente - followup_df['DATAULTIMAMENSAGEM']).dt.days
+    
+    # Adicionar informação de tempo total do atendimento
+    followup_df['DIAS_TOTAL'] = (data_mais_recente - followup_df['DATA']).dt.days
+
+    # As datas ficam como datetime64: só a página exibida é formatada
+    return followup_df, data_mais_recente
+
+# Operadores gerados pelo filtro do DataTable (filter_action='custom')
+FILTER_OPERATORS = {
+    'ge': 'ge', '>=': 'ge',
+    'le': 'le', '<=': 'le',
+    'lt': 'lt', '<': 'lt',
+    'gt': 'gt', '>': 'gt',
+    'ne': 'ne', '!=': 'ne',
+    'eq': 'eq', '=': 'eq',
+    'contains': 'contains',
+    'datestartswith': 'datestartswith'
+}
+
+# Trecho do filter_query: {COLUNA} operador valor
+FILTER_PART_RE = re.compile(r'^\{(?P<col>[^}]+)\}\s+(?P<op>\S+)\s+(?P<val>.*)$')
+
+def _split_filter_part(filter_part):
+    """Separa um trecho do filter_query em (coluna, operador, valor em texto)"""
+    match = FILTER_PART_RE.match(filter_part.strip())
+    if not match:
+        return None, None, None
+    op = match.group('op')
+    # O DataTable pode prefixar o operador com 's' (sensível a maiúsculas)
+    if op not in FILTER_OPERATORS and op[:1] == 's':
+        op = op[1:]
+    value = match.group('val').strip()
+    quote = value[:1]
+    if len(value) > 1 and quote == value[-1] and quote in ('"', "'", '`'):
+        value = value[1:-1].replace('\\' + quote, quote)
+    return match.group('col'), FILTER_OPERATORS.get(op), value
+
+def _coluna_exibida(dff, col_name):
+    """Coluna como aparece na tabela (datas no formato DATE_FORMAT)"""
+    if pd.api.types.is_datetime64_any_dtype(dff[col_name]):
+        return dff[col_name].dt.strftime(DATE_FORMAT)
+    return dff[col_name]
+
+def paginar_followup(followup_df, page_current, page_size, sort_by, filter_query):
+    """
+    Aplica filtro, ordenação e paginação da tabela no servidor
+    Returns:
+        Tupla (registros da página, total de páginas, página exibida)
+    """
+    dff = followup_df
+    for filter_part in (filter_query or '').split(' && '):
+        col_name, operator, filter_value = _split_filter_part(filter_part)
+        if col_name not in dff.columns:
+            continue
+        coluna = _coluna_exibida(dff, col_name)
+        if operator in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
+            # Comparações usam o valor numérico quando o texto é um número
+            try:
+                filter_value = float(filter_value)
+            except ValueError:
+                pass
+            try:
+                dff = dff.loc[getattr(coluna, operator)(filter_value)]
+            except TypeError:
+                # Comparação inválida para a coluna (ex.: texto > número): nenhuma linha
+                dff = dff.iloc[0:0]
+        elif operator == 'contains':
+            dff = dff.loc[coluna.astype(str).str.contains(filter_value, regex=False)]
+        elif operator == 'datestartswith':
+            dff = dff.loc[coluna.astype(str).str.startswith(filter_value)]
+
+    if sort_by:
+        dff = dff.sort_values(
+            [col['column_id'] for col in sort_by],
+            ascending=[col['direction'] == 'asc' for col in sort_by]
+        )
+
+    # Um filtro pode reduzir o total de páginas: voltar para a última existente
+    page_count = max(1, (len(dff) + page_size - 1) // page_size)
+    page_current = min(page_current, page_count - 1)
+    start = page_current * page_size
+    page = dff.iloc[start:start + page_size]
+    records = page.assign(**{col: _coluna_exibida(page, col) for col in ('DATA', 'DATAULTIMAMENSAGEM')}).to_dict('records')
+    return records, page_count, page_current
+
+def criar_tabela_followup(df_hash, resumo):
+    """
+    Cria tabela de follow-up baseada nos dados do CSV
+    """
+    followup_df, data_mais_recente = preparar_followup(df_hash, resumo)
+    data, page_count, _page_current = paginar_followup(followup_df, 0, FOLLOWUP_PAGE_SIZE, [], '')
+    
+    # Criar tabela Dash
+    table = dash_table.DataTable(
+        id='followup-datatable',
+        data=data,
+        columns=[
+            {'name': 'Nome', 'id': 'NOME'},
+            {'name': 'Número', 'id': 'NUMERO'},
+            {'name': 'Status', 'id': 'STATUS'},
+            {'name': 'Data Início', 'id': 'DATA'},
+            {'name': 'Último Contato', 'id': 'DATAULTIMAMENSAGEM'},
+            {'name': 'Dias Sem Contato', 'id': 'DIAS_SEM_CONTATO'},
+            {'name': 'Dias Total', 'id': 'DIAS_TOTAL'}
+        ],
+        style_table={'overflowX': 'auto'},
+        style_cell={
+            'textAlign': 'left',
+            'padding': '10px',
+            'backgroundColor': COLORS['card']
+        },
+        style_header={
+            'backgroundColor': COLORS['primary'],
+            'color': 'white',
+            'fontWeight': 'bold'
+        },
+        style_data_conditional=[
+            {
+                'if': {'row_index': 'odd'},
+                'backgroundColor': COLORS['background']
+            },
+            {
+                'if': {'filter_query': '{DIAS_SEM_CONTATO} > 3'},
+                'backgroundColor': '#ffebee',
+                'color': '#c62828'
+            }
+        ],
+        page_action='custom',
+        sort_action='custom',
+        filter_action='custom',
+        page_current=0,
+        page_size=FOLLOWUP_PAGE_SIZE,
+        page_count=page_count
+    )
+    
+    return html.Div([
+        html.H3('Follow-up de Clientes',
+                style={'color': COLORS['primary'], 'marginBottom': '20px'}),
+        html.P(f'Dados atualizados até: {data_mais_recente.strftime("%d/%m/%Y %H:%M")}',
+               style={'color': COLORS['text'], 'marginBottom': '20px'}),
+        table
+    ], style=CARD_STYLE)
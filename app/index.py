@@ -1,221 +1,95 @@
-import base64
-import io
-import pandas as pd
+import functools
+import getpass
+import os
+import stat
+import sys
+import tempfile
 import dash
-from dash import html, dcc, dash_table  # Adicionado dash_table
+import diskcache
+from dash import html, dcc, DiskcacheManager
 from dash.dependencies import Input, Output, State
-import plotly.express as px
-import plotly.graph_objects as go
+import plotly.io as pio
 import requests
 
-# Cores e estilos
-COLORS = {
-    'background': '#f8f9fa',
-    'card': '#ffffff',
-    'primary': '#2C3E50',
-    'secondary': '#3498DB',
-    'text': '#2c3e50',
-    'border': '#e9ecef'
-}
+# Executado como script (python app/index.py) ou carregado pelo caminho do
+# arquivo, o pacote app não está no sys.path: incluir a raiz do projeto
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Estilos comuns
-CARD_STYLE = {
-    'backgroundColor': COLORS['card'],
-    'borderRadius': '8px',
-    'boxShadow': '0 2px 4px rgba(0,0,0,0.1)',
-    'padding': '20px',
-    'margin': '10px',
-    'border': f'1px solid {COLORS["border"]}'
-}
-
-# Estilo comum para os gráficos
-GRAPH_STYLE = {
-    'paper_bgcolor': COLORS['background'],
-    'plot_bgcolor': COLORS['background'],
-    'font': {'color': COLORS['text']},
-    'title': {'font': {'size': 20, 'color': COLORS['primary']}}
-}
-
-# Atualizar parse_contents para corrigir warning de datas
-def parse_contents(contents):
-    """Função para processar o arquivo carregado"""
-    try:
-        _content_type, content_string = contents.split(',')
-        decoded = base64.b64decode(content_string)
-        df = pd.read_csv(
-            io.StringIO(decoded.decode('utf-8')),
-            parse_dates=['DATA', 'DATAFINALIZACAO', 'DATAULTIMAMENSAGEM'],
-            dayfirst=True
-        )
-        return df, None
-    except Exception as e:
-        return None, f'Erro ao processar arquivo: {str(e)}'
-
-def atualizar_graficos(df):
-    """
-    Função para atualizar os gráficos com base no DataFrame
-    Args:
-        df: DataFrame com os dados processados
-    Returns:
-        Tupla com os gráficos atualizados
-    """
-    # Preparação dos dados
-    df['DATA'] = pd.to_datetime(df['DATA'])
-    df['DATAFINALIZACAO'] = pd.to_datetime(df['DATA'])
-    df['TEMPO_ATENDIMENTO'] = (df['DATAFINALIZACAO'] - df['DATA']).dt.total_seconds() / 3600
-
-    # Gráfico de Status
-    status_df = df['STATUS'].value_counts().reset_index()
-    status_df.columns = ['Status', 'Quantidade']
-    fig_status = px.bar(
-        status_df,
-        x='Status',
-        y='Quantidade',
-        title='Distribuição de Status'
-    )
-
-    # Gráfico de Departamentos
-    dept_df = df['DEPARTAMENTO'].value_counts().reset_index()
-    dept_df.columns = ['Departamento', 'Quantidade']
-    fig_dept = px.pie(
-        dept_df,
-        values='Quantidade',
-        names='Departamento',
-        title='Distribuição por Departamento'
-    )
-
-    # Gráfico Timeline
-    timeline_df = df.groupby(df['DATA'].dt.date).size().reset_index()
-    timeline_df.columns = ['Data', 'Quantidade']
-    fig_timeline = px.line(
-        timeline_df,
-        x='Data',
-        y='Quantidade',
-        title='Volume de Atendimentos por Dia'
-    )
-
-    # Gráfico Tags
-    tags_df = pd.Series([x.strip() for tags in df['TAGS'].dropna() for x in tags.split(',')]).value_counts().head(10).reset_index()
-    tags_df.columns = ['Tag', 'Quantidade']
-    fig_tags = px.bar(
-        tags_df,
-        x='Tag',
-        y='Quantidade', 
-        title='Tags',
-        labels={'Tag': 'Tags', 'Quantidade': 'Número de Ocorrências'}
-    )
-
-    # Gráfico de Colaboradores
-    colaboradores_df = df['ATENDENTE'].value_counts().head(10).reset_index()
-    colaboradores_df.columns = ['Colaborador', 'Quantidade']
-    fig_atendentes = px.bar(
-        colaboradores_df,
-        x='Colaborador',
-        y='Quantidade',
-        title='Distribuição dos Colaboradores'
-    )
-
-    # KPIs
-    kpi_fig = go.Figure()
-    kpi_fig.add_trace(go.Indicator(
-        mode="number",
-        value=len(df),
-        title="Total de Atendimentos",
-        domain={'row': 0, 'column': 0}
-    ))
-
-    # Atualizar layouts
-    for fig in [fig_status, fig_dept, fig_timeline, fig_tags, fig_atendentes, kpi_fig]:
-        fig.update_layout(**GRAPH_STYLE)
+from app.data import (
+    COLORS,
+    CARD_STYLE,
+    cache,
+    CACHE_TIMEOUT,
+    parse_contents,
+    atualizar_graficos,
+    criar_patches,
+    preparar_followup,
+    paginar_followup,
+    criar_tabela_followup
+)
 
-    return fig_status, fig_dept, fig_timeline, fig_tags, fig_atendentes, kpi_fig
+# Serializar as figuras com orjson (Dash usa o encoder do Plotly nas respostas)
+pio.json.config.default_engine = 'orjson'
 
 # Adicionar função para buscar foto do GitHub
+@functools.lru_cache(maxsize=1)
 def get_github_avatar():
     try:
-        response = requests.get('https://api.github.com/users/polabiel')
+        response = requests.get('https://api.github.com/users/polabiel', timeout=2)
         if response.status_code == 200:
             return response.json()['avatar_url']
         return None
     except requests.exceptions.RequestException:
         return None
 
-def criar_tabela_followup(df):
+# Foto do footer, resolvida uma única vez ao carregar o módulo
+GITHUB_AVATAR_URL = get_github_avatar() or 'https://github.com/polabiel.png'
+
+def _diretorio_cache():
     """
-    Cria tabela de follow-up baseada nos dados do CSV
+    Diretório dos caches em disco, o mesmo para todos os workers:
+    DASHSEMA_CACHE_DIR ou <tmp>/dashsema-<uid>. Como os caches guardam
+    pickles, só é aceito se pertencer ao usuário do processo com modo 0700
     """
-    # Converter datas
-    df['DATAULTIMAMENSAGEM'] = pd.to_datetime(df['DATAULTIMAMENSAGEM'], format='%d/%m/%Y %H:%M')
-    df['DATA'] = pd.to_datetime(df['DATA'], format='%d/%m/%Y %H:%M')
-    
-    # Encontrar última interação por número
-    followup_df = df.groupby(['NUMERO', 'NOME', 'STATUS']).agg({
-        'DATAULTIMAMENSAGEM': 'max',
-        'DATA': 'min'  # Data de criação do atendimento
-    }).reset_index()
-    
-    # Encontrar data mais recente no dataset
-    data_mais_recente = df['DATAULTIMAMENSAGEM'].max()
-    
-    # Calcular dias sem contato
-    followup_df['DIAS_SEM_CONTATO'] = (data_mais_recente - followup_df['DATAULTIMAMENSAGEM']).dt.days
-    
-    # Adicionar informação de tempo total do atendimento
-    followup_df['DIAS_TOTAL'] = (data_mais_recente - followup_df['DATA']).dt.days
-    
-    # Formatar datas para exibição
-    followup_df['DATAULTIMAMENSAGEM'] = followup_df['DATAULTIMAMENSAGEM'].dt.strftime('%d/%m/%Y %H:%M')
-    followup_df['DATA'] = followup_df['DATA'].dt.strftime('%d/%m/%Y %H:%M')
-    
-    # Criar tabela Dash
-    table = dash_table.DataTable(
-        data=followup_df.to_dict('records'),
-        columns=[
-            {'name': 'Nome', 'id': 'NOME'},
-            {'name': 'Número', 'id': 'NUMERO'},
-            {'name': 'Status', 'id': 'STATUS'},
-            {'name': 'Data Início', 'id': 'DATA'},
-            {'name': 'Último Contato', 'id': 'DATAULTIMAMENSAGEM'},
-            {'name': 'Dias Sem Contato', 'id': 'DIAS_SEM_CONTATO'},
-            {'name': 'Dias Total', 'id': 'DIAS_TOTAL'}
-        ],
-        style_table={'overflowX': 'auto'},
-        style_cell={
-            'textAlign': 'left',
-            'padding': '10px',
-            'backgroundColor': COLORS['card']
-        },
-        style_header={
-            'backgroundColor': COLORS['primary'],
-            'color': 'white',
-            'fontWeight': 'bold'
-        },
-        style_data_conditional=[
-            {
-                'if': {'row_index': 'odd'},
-                'backgroundColor': COLORS['background']
-            },
-            {
-                'if': {'filter_query': '{DIAS_SEM_CONTATO} > 3'},
-                'backgroundColor': '#ffebee',
-                'color': '#c62828'
-            }
-        ],
-        sort_action='native',
-        filter_action='native',
-        page_size=10
-    )
-    
-    return html.Div([
-        html.H3('Follow-up de Clientes',
-                style={'color': COLORS['primary'], 'marginBottom': '20px'}),
-        html.P(f'Dados atualizados até: {data_mais_recente.strftime("%d/%m/%Y %H:%M")}',
-               style={'color': COLORS['text'], 'marginBottom': '20px'}),
-        table
-    ], style=CARD_STYLE)
+    usuario = os.getuid() if hasattr(os, 'getuid') else getpass.getuser()
+    path = os.environ.get('DASHSEMA_CACHE_DIR') or os.path.join(tempfile.gettempdir(), f'dashsema-{usuario}')
+    os.makedirs(path, mode=0o700, exist_ok=True)
+
+    info = os.lstat(path)
+    if (not stat.S_ISDIR(info.st_mode)
+            or (hasattr(os, 'getuid') and info.st_uid != os.getuid())
+            or info.st_mode & 0o077):
+        raise RuntimeError(
+            f'Diretório de cache {path} precisa ser um diretório (não um link) do usuário do app, com modo 0700'
+        )
+    return path
+
+CACHE_ROOT = _diretorio_cache()
+
+# O processamento do upload roda em processos separados (background callback).
+# O diretório é compartilhado para que qualquer worker encontre o resultado de
+# um job; o Dash apaga cada resultado ao entregá-lo e size_limit descarta os
+# mais antigos de jobs abandonados
+BACKGROUND_CACHE_SIZE_LIMIT = 256 * 1024 * 1024
+background_callback_manager = DiskcacheManager(
+    diskcache.Cache(os.path.join(CACHE_ROOT, 'callbacks'), size_limit=BACKGROUND_CACHE_SIZE_LIMIT)
+)
 
 # Layout do app
-app = dash.Dash(__name__)
+# A tabela de follow-up é criada pelo callback, fora do layout inicial;
+# compress=True comprime as respostas com gzip (Flask-Compress)
+app = dash.Dash(
+    __name__,
+    suppress_callback_exceptions=True,
+    compress=True,
+    background_callback_manager=background_callback_manager
+)
+cache.init_app(app.server, config={
+    'CACHE_TYPE': 'FileSystemCache',
+    'CACHE_DIR': os.path.join(CACHE_ROOT, 'cache'),
+    'CACHE_DEFAULT_TIMEOUT': CACHE_TIMEOUT
+})
 app.layout = html.Div([
     # Header
     html.Div([
@@ -253,6 +127,9 @@ app.layout = html.Div([
         )
     ], style=CARD_STYLE),
     
+    # Hash do último arquivo exibido (indica se os gráficos já estão na tela)
+    dcc.Store(id='upload-hash'),
+    
     # Mensagem de feedback
     html.Div(id='output-message', style={'textAlign': 'center', 'margin': '20px'}),
     
@@ -302,7 +179,7 @@ app.layout = html.Div([
     # Footer
     html.Footer([
         html.Img(
-            src=get_github_avatar() or 'https://github.com/polabiel.png',
+            src=GITHUB_AVATAR_URL,
             style={
                 'width': '40px',
                 'height': '40px',
@@ -350,14 +227,6 @@ app.layout = html.Div([
     'flexDirection': 'column'
 })
 
-# Atualizar estilo dos gráficos
-GRAPH_STYLE.update({
-    'margin': dict(t=30, l=10, r=10, b=10),
-    'font': {'family': '"Segoe UI", "Roboto", sans-serif', 'color': COLORS['text']},
-    'plot_bgcolor': COLORS['card'],
-    'paper_bgcolor': COLORS['card']
-})
-
 # Atualizar callback para incluir a tabela
 @app.callback(
     [Output('status-graph', 'figure'),
@@ -367,22 +236,34 @@ GRAPH_STYLE.update({
      Output('atendentes-graph', 'figure'),
      Output('kpi-indicators', 'figure'),
      Output('followup-table', 'children'),
+     Output('upload-hash', 'data'),
      Output('output-message', 'children')],
     [Input('upload-data', 'contents')],
-    [State('upload-data', 'filename')]
+    [State('upload-data', 'filename'),
+     State('upload-hash', 'data')],
+    prevent_initial_call=True,
+    background=True,
+    running=[(Output('upload-data', 'disabled'), True, False)]
 )
-def update_dashboard(contents, filename):
-    if contents is None:
-        return [dash.no_update] * 8
-    
+def update_dashboard(contents, filename, hash_anterior):
     try:
-        df, error_message = parse_contents(contents)
+        resumo, df_hash, error_message = parse_contents(contents)
         if error_message:
-            return [dash.no_update] * 7 + [error_message]
+            return [dash.no_update] * 8 + [error_message]
+        
+        # Mesmo arquivo já exibido: nada a reenviar, mas a tabela de
+        # follow-up volta ao cache caso tenha expirado
+        if df_hash == hash_anterior:
+            preparar_followup(df_hash, resumo)
+            return [dash.no_update] * 8 + [f'Arquivo {filename} processado com sucesso!']
         
         # Gerar gráficos e análises
-        fig_status, fig_dept, fig_timeline, fig_tags, fig_atendentes, kpi_fig = atualizar_graficos(df)
-        followup_table = criar_tabela_followup(df)
+        figuras = atualizar_graficos(df_hash, resumo)
+        if hash_anterior is not None:
+            # Gráficos já na tela: enviar só os dados novos
+            figuras = criar_patches(figuras)
+        fig_status, fig_dept, fig_timeline, fig_tags, fig_atendentes, kpi_fig = figuras
+        followup_table = criar_tabela_followup(df_hash, resumo)
         
         return [
             fig_status,
@@ -392,11 +273,35 @@ def update_dashboard(contents, filename):
             fig_atendentes,
             kpi_fig,
             followup_table,
+            df_hash,
             f'Arquivo {filename} processado com sucesso!'
         ]
         
     except Exception as e:
-        return [dash.no_update] * 7 + [f'Erro ao processar arquivo: {str(e)}']
+        return [dash.no_update] * 8 + [f'Erro ao processar arquivo: {str(e)}']
+
+@app.callback(
+    [Output('followup-datatable', 'data'),
+     Output('followup-datatable', 'page_count'),
+     Output('followup-datatable', 'page_current'),
+     Output('output-message', 'children', allow_duplicate=True)],
+    [Input('followup-datatable', 'page_current'),
+     Input('followup-datatable', 'page_size'),
+     Input('followup-datatable', 'sort_by'),
+     Input('followup-datatable', 'filter_query')],
+    [State('upload-hash', 'data')],
+    prevent_initial_call=True
+)
+def update_table(page_current, page_size, sort_by, filter_query, df_hash):
+    followup = preparar_followup(df_hash)
+    if followup is None:
+        # Cache expirado (CACHE_TIMEOUT) ou gravado por outro servidor
+        return [dash.no_update] * 3 + [
+            'Os dados do follow-up expiraram. Carregue o arquivo novamente para navegar na tabela.'
+        ]
+    
+    data, page_count, page_current = paginar_followup(followup[0], page_current, page_size, sort_by, filter_query)
+    return data, page_count, page_current, dash.no_update
 
 if __name__ == "__main__":
     app.run(port=8080, dev_tools_ui=True, debug=True, host="127.0.0.1")
\ No newline at end of file